@@ -31,6 +31,11 @@ class Settings(BaseSettings):
     langfuse_secret_key: Optional[str] = None
     langfuse_session_id: str = "local-cli"
 
+    # Graph
+    # Start retrieval in the background while the guardrail runs; results are
+    # dropped on rejection.
+    speculative_retrieval: bool = False
+
     # Guardrails
     unsupported_query_message: str = (
         "I can only answer questions about the ingested Python codebase. "
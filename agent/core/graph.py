@@ -1,26 +1,66 @@
 from langgraph.graph import END, StateGraph
 
-from agent.core.nodes import chat_node, retrieval_node, guardrail_node
+from agent.config import settings
+from agent.core.nodes import (
+    chat_node,
+    guardrail_node,
+    retrieval_node,
+    speculative_guardrail_node,
+)
 from agent.core.state import State
-from agent.core.telemetry import langfuse_handler
 
 
-def build_graph():
-    graph = StateGraph(State)
+def _route_after_guardrail(state: State) -> str:
+    return "end" if state.get("guardrail_message") is not None else "continue"
+
 
+def _add_sequential_nodes(graph: StateGraph) -> None:
     graph.add_node("guardrail", guardrail_node)
     graph.add_node("retrieval", retrieval_node)
-    graph.add_node("chat", chat_node)
 
     graph.set_entry_point("guardrail")
 
     graph.add_conditional_edges(
         "guardrail",
-        lambda state: "end" if state["guardrail_message"] is not None else "continue",
+        _route_after_guardrail,
         {"end": END, "continue": "retrieval"},
     )
 
     graph.add_edge("retrieval", "chat")
+
+
+def _add_speculative_nodes(graph: StateGraph) -> None:
+    # Retrieval runs inside this node, overlapped with the guardrail check.
+    graph.add_node("guardrail_retrieval", speculative_guardrail_node)
+
+    graph.set_entry_point("guardrail_retrieval")
+
+    graph.add_conditional_edges(
+        "guardrail_retrieval",
+        _route_after_guardrail,
+        {"end": END, "continue": "chat"},
+    )
+
+
+def build_graph(with_telemetry: bool = True, speculative: bool | None = None):
+    if speculative is None:
+        speculative = settings.speculative_retrieval
+
+    graph = StateGraph(State)
+    graph.add_node("chat", chat_node)
+
+    if speculative:
+        _add_speculative_nodes(graph)
+    else:
+        _add_sequential_nodes(graph)
+
     graph.add_edge("chat", END)
 
-    return graph.compile().with_config({"callbacks": [langfuse_handler]})
+    compiled = graph.compile()
+    if not with_telemetry:
+        return compiled
+
+    # Imported lazily: the telemetry module performs a Langfuse auth check on import.
+    from agent.core.telemetry import langfuse_handler
+
+    return compiled.with_config({"callbacks": [langfuse_handler]})
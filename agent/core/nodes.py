@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import threading
+from concurrent.futures import Future
 from typing import List
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
@@ -12,12 +14,9 @@ from agent.core.guardrails import (
     ensure_supported_query,
 )
 from agent.core.llm import get_llm
-from agent.core.retrieval import similarity_search
+from agent.core.retrieval import RetrievalResult, similarity_search
 from agent.core.state import State
 
-_llm = get_llm()
-
-
 def _last_user_message(messages: List) -> HumanMessage | None:
     for message in reversed(messages):
         if isinstance(message, HumanMessage):
@@ -25,15 +24,21 @@ def _last_user_message(messages: List) -> HumanMessage | None:
     return None
 
 
-def guardrail_node(state: State) -> State:
-    messages = state.get("messages", [])
+def _guardrail_message(messages: List) -> str | None:
     user_message = _last_user_message(messages)
     if not user_message:
-        return {"guardrail_message": FALLBACK_MESSAGE}
+        return FALLBACK_MESSAGE
     try:
         ensure_supported_query(str(user_message.content))
     except GuardrailViolation as exc:
-        return {"retrieved_context": [], "guardrail_message": str(exc)}
+        return str(exc)
+    return None
+
+
+def guardrail_node(state: State) -> State:
+    guardrail_message = _guardrail_message(state.get("messages", []))
+    if guardrail_message is not None:
+        return {"retrieved_context": [], "guardrail_message": guardrail_message}
 
     return state
 
@@ -49,6 +54,62 @@ def retrieval_node(state: State) -> State:
     return {"retrieved_context": result.chunks, "guardrail_message": None}
 
 
+class _SpeculationGate:
+    """Holds a speculative search at each paid step until the guardrail decides."""
+
+    def __init__(self) -> None:
+        self._decided = threading.Event()
+        self._accepted = False
+
+    def decide(self, accepted: bool) -> None:
+        self._accepted = accepted
+        self._decided.set()
+
+    def proceed(self) -> bool:
+        self._decided.wait()
+        return self._accepted
+
+
+def _start_search(query: str, gate: _SpeculationGate) -> Future[RetrievalResult]:
+    # One daemon thread per call: searches never queue behind abandoned ones,
+    # and an abandoned search cannot hold up interpreter exit.
+    future: Future[RetrievalResult] = Future()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(similarity_search(query, proceed=gate.proceed))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    threading.Thread(target=run, name="speculative-retrieval", daemon=True).start()
+    return future
+
+
+def speculative_guardrail_node(state: State) -> State:
+    """Run the guardrail while retrieval for the same query starts in the background.
+
+    The search prepares the query concurrently and makes its embedding call and
+    database query only once the guardrail accepts. A rejected query returns
+    immediately and the search stops without making either; an accepted query
+    waits for the search result.
+    """
+    messages = state.get("messages", [])
+    user_message = _last_user_message(messages)
+    if not user_message:
+        return {"retrieved_context": [], "guardrail_message": FALLBACK_MESSAGE}
+
+    gate = _SpeculationGate()
+    search = _start_search(str(user_message.content), gate)
+    guardrail_message = _guardrail_message(messages)
+    gate.decide(accepted=guardrail_message is None)
+    if guardrail_message is not None:
+        return {"retrieved_context": [], "guardrail_message": guardrail_message}
+
+    return {"retrieved_context": search.result().chunks, "guardrail_message": None}
+
+
 def _format_context(chunks: List[dict]) -> str:
     if not chunks:
         return "No matching code chunks were retrieved."
@@ -91,7 +152,7 @@ def chat_node(state: State) -> State:
                 )
             ),
         ]
-        response = _llm.invoke(prompt_messages)
+        response = get_llm().invoke(prompt_messages)
         response_text = (
             str(response.content) if isinstance(response, AIMessage) else str(response)
         )
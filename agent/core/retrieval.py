@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Callable, Iterable, List
 
 from psycopg2.extras import RealDictCursor
 
@@ -57,27 +57,164 @@ def preprocess_query(query: str) -> PreprocessedQuery:
     return PreprocessedQuery(original=query, cleaned=cleaned, file_filters=file_matches)
 
 
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 def _format_file_filter_clause(file_filters: Iterable[str]) -> tuple[str, list]:
-    filters = list({path.strip() for path in file_filters if path.strip()})
+    """Build path predicates that resolve through the file_name/file_path indexes."""
+    # Matching is case-insensitive, against lower(...) expression indexes.
+    filters = sorted(
+        {
+            path.strip().lower().removeprefix("./")
+            for path in file_filters
+            if path.strip()
+        }
+    )
     if not filters:
         return "", []
 
     conditions: list[str] = []
     params: list[str] = []
     for file_value in filters:
+        file_name = file_value.rsplit("/", 1)[-1]
         if "/" in file_value:
-            conditions.append("file_path ILIKE %s")
-            params.append(f"%{file_value}%")
+            # Exact path, or a partial path anchored on the indexed file name.
+            conditions.append(
+                "(lower(code_embeddings.file_path) = %s OR ("
+                "lower(code_embeddings.file_name) = %s "
+                "AND lower(code_embeddings.file_path) LIKE %s))"
+            )
+            params.extend([file_value, file_name, f"%/{_escape_like(file_value)}"])
         else:
-            conditions.append("file_name ILIKE %s")
-            params.append(f"%{file_value}%")
+            conditions.append("lower(code_embeddings.file_name) = %s")
+            params.append(file_value)
 
     clause = " AND (" + " OR ".join(conditions) + ")"
     return clause, params
 
 
-def similarity_search(query: str, limit: int = 5) -> RetrievalResult:
-    """Execute a similarity search over the code_embeddings table."""
+_SELECT_COLUMNS = """
+            code_embeddings.file_path,
+            code_embeddings.file_name,
+            code_embeddings.file_extension,
+            code_embeddings.chunk_index,
+            code_embeddings.total_chunks,
+            code_embeddings.token_count,
+            code_embeddings.content
+"""
+# Filtered result sets up to this size are ranked exactly instead of via the index.
+_EXACT_SCAN_MAX_ROWS = 5000
+_IVFFLAT_LISTS = 100  # matches idx_embedding_vectors_embedding
+_INITIAL_PROBES = 4
+_OVERFETCH_FACTOR = 4
+
+
+def _count_matching_rows(cur, model: str, clause: str, params: list) -> int:
+    # Counting stops past the exact-scan threshold; beyond it only "too many"
+    # matters.
+    cur.execute(
+        f"""
+        SELECT count(*) AS matches
+        FROM (
+            SELECT 1
+            FROM code_embeddings
+            WHERE code_embeddings.embedding_model = %s
+            {clause}
+            LIMIT %s
+        ) matching
+        """,
+        (model, *params, _EXACT_SCAN_MAX_ROWS + 1),
+    )
+    return cur.fetchone()["matches"]
+
+
+def _exact_search(
+    cur, model: str, clause: str, params: list, embedding, limit: int
+) -> List[dict]:
+    # The materialized CTE keeps the planner from ordering through the ANN
+    # index, so every matching row is scored.
+    cur.execute(
+        f"""
+        WITH scored AS MATERIALIZED (
+            SELECT
+                {_SELECT_COLUMNS},
+                embedding_vectors.embedding <=> %s::vector AS distance
+            FROM code_embeddings
+            JOIN embedding_vectors
+                ON embedding_vectors.content_hash = code_embeddings.content_hash
+                AND embedding_vectors.model = code_embeddings.embedding_model
+            WHERE code_embeddings.embedding_model = %s
+            {clause}
+        )
+        SELECT * FROM scored
+        ORDER BY distance
+        LIMIT %s
+        """,
+        (embedding, model, *params, limit),
+    )
+    return cur.fetchall()
+
+
+def _index_search(
+    cur, model: str, clause: str, params: list, embedding, limit: int
+) -> List[dict]:
+    # Probe the IVFFlat index for nearest vectors, then apply the filters.
+    # Widen the probe and the candidate pool until enough rows survive.
+    probes = _INITIAL_PROBES
+    candidates = limit * _OVERFETCH_FACTOR
+    while True:
+        cur.execute("SELECT set_config('ivfflat.probes', %s, true)", (str(probes),))
+        cur.execute(
+            f"""
+            SELECT {_SELECT_COLUMNS}
+            FROM (
+                SELECT
+                    content_hash,
+                    model,
+                    embedding <=> %s::vector AS distance
+                FROM embedding_vectors
+                WHERE model = %s
+                ORDER BY embedding <=> %s::vector
+                LIMIT %s
+            ) nearest
+            JOIN code_embeddings
+                ON code_embeddings.content_hash = nearest.content_hash
+                AND code_embeddings.embedding_model = nearest.model
+            WHERE 1=1
+            {clause}
+            ORDER BY nearest.distance
+            LIMIT %s
+            """,
+            (embedding, model, embedding, candidates, *params, limit),
+        )
+        rows = cur.fetchall()
+        if len(rows) >= limit:
+            return rows
+        probes *= 2
+        candidates *= 2
+        if probes >= _IVFFLAT_LISTS:
+            # Probing every list is a full scan anyway; scanning only the
+            # filtered rows gives the exact top-k in one pass.
+            return _exact_search(cur, model, clause, params, embedding, limit)
+
+
+def _cancelled_result(processed: PreprocessedQuery) -> RetrievalResult:
+    return RetrievalResult(
+        chunks=[],
+        processed_query=processed.cleaned,
+        error="Retrieval was cancelled.",
+    )
+
+
+def similarity_search(
+    query: str, limit: int = 5, proceed: Callable[[], bool] | None = None
+) -> RetrievalResult:
+    """Execute a similarity search over the shared embedding store.
+
+    ``proceed`` is called before the embedding call and before the database
+    query; when it returns False the search stops without making either.
+    """
     embedding_client = get_embeddings_client()
 
     processed = preprocess_query(query)
@@ -88,6 +225,9 @@ def similarity_search(query: str, limit: int = 5) -> RetrievalResult:
             error="I could not understand that query.",
         )
 
+    if proceed is not None and not proceed():
+        return _cancelled_result(processed)
+
     # Build query embedding
     try:
         embedding = embedding_client.embed_query(processed.cleaned)
@@ -100,31 +240,24 @@ def similarity_search(query: str, limit: int = 5) -> RetrievalResult:
 
     # Build filter clause (for file filters etc.)
     clause, params = _format_file_filter_clause(processed.file_filters)
-    # Ensure clause is a string and includes its own leading whitespace if present
-    clause = clause or ""
-
-    sql = f"""
-        SELECT
-            file_path,
-            file_name,
-            file_extension,
-            chunk_index,
-            total_chunks,
-            token_count,
-            content
-        FROM code_embeddings
-        WHERE 1=1
-        {clause}
-        ORDER BY embedding <=> %s::vector
-        LIMIT %s
-        """
+    model = settings.embeddings_model
 
     chunks: List[dict] = []
 
+    if proceed is not None and not proceed():
+        return _cancelled_result(processed)
+
     with get_connection() as conn:
         with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(sql, (*params, embedding, limit))
-            rows = cur.fetchall()
+            matches = (
+                _count_matching_rows(cur, model, clause, params) if clause else None
+            )
+            if matches == 0:
+                rows = []
+            elif matches is not None and matches <= _EXACT_SCAN_MAX_ROWS:
+                rows = _exact_search(cur, model, clause, params, embedding, limit)
+            else:
+                rows = _index_search(cur, model, clause, params, embedding, limit)
 
     for row in rows:
         chunks.append(
@@ -0,0 +1,75 @@
+-- Content-addressed embedding store: one vector per (content hash, model),
+-- shared by every location (file, branch, repository) holding that content.
+CREATE TABLE IF NOT EXISTS embedding_vectors (
+    content_hash TEXT NOT NULL, -- sha256 of the chunk content only
+    model TEXT NOT NULL, -- embeddings model that produced the vector
+    embedding vector(1536) NOT NULL, -- OpenAI embeddings dimension
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    PRIMARY KEY (content_hash, model)
+);
+
+-- code_embeddings now only holds location metadata. content_hash used to be
+-- salted with path and chunk index; recompute it from the content alone.
+ALTER TABLE code_embeddings ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+ALTER TABLE code_embeddings DROP CONSTRAINT IF EXISTS code_embeddings_content_hash_key;
+
+-- Model that produced the existing vectors; must match EMBEDDINGS_MODEL.
+-- Override with: psql -v embedding_model=<model> -f 003_embedding_store.sql
+\if :{?embedding_model}
+\else
+\set embedding_model 'text-embedding-3-small'
+\endif
+
+UPDATE code_embeddings
+SET
+    content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex'),
+    embedding_model = :'embedding_model'
+WHERE embedding_model IS NULL;
+
+-- Only possible while the old embedding column is still there.
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_name = 'code_embeddings' AND column_name = 'embedding'
+    ) THEN
+        INSERT INTO embedding_vectors (content_hash, model, embedding)
+        SELECT DISTINCT ON (content_hash, embedding_model) content_hash, embedding_model, embedding
+        FROM code_embeddings
+        WHERE embedding IS NOT NULL
+        ON CONFLICT (content_hash, model) DO NOTHING;
+    END IF;
+END
+$$;
+
+DELETE FROM code_embeddings ce
+WHERE NOT EXISTS (
+    SELECT 1 FROM embedding_vectors ev
+    WHERE ev.content_hash = ce.content_hash AND ev.model = ce.embedding_model
+);
+
+ALTER TABLE code_embeddings DROP COLUMN IF EXISTS embedding;
+ALTER TABLE code_embeddings ALTER COLUMN embedding_model SET NOT NULL;
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'fk_code_embeddings_vector'
+    ) THEN
+        ALTER TABLE code_embeddings
+            ADD CONSTRAINT fk_code_embeddings_vector
+            FOREIGN KEY (content_hash, embedding_model)
+            REFERENCES embedding_vectors (content_hash, model);
+    END IF;
+END
+$$;
+
+-- Indexes for performance
+CREATE INDEX IF NOT EXISTS idx_code_embeddings_vector_ref
+ON code_embeddings(content_hash, embedding_model);
+
+-- Vector similarity search index (IVFFlat for good performance)
+CREATE INDEX IF NOT EXISTS idx_embedding_vectors_embedding
+ON embedding_vectors
+USING ivfflat (embedding vector_cosine_ops)
+WITH (lists = 100);
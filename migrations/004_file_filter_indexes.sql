@@ -0,0 +1,6 @@
+-- Indexes backing case-insensitive exact file name / path filters in similarity search
+CREATE INDEX IF NOT EXISTS idx_code_embeddings_model_file_name
+ON code_embeddings(embedding_model, lower(file_name));
+
+CREATE INDEX IF NOT EXISTS idx_code_embeddings_model_file_path
+ON code_embeddings(embedding_model, lower(file_path));
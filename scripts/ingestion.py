@@ -10,6 +10,7 @@ from typing import Iterable, List
 from psycopg2.extras import RealDictCursor
 
 import tiktoken
+from agent.config import settings
 from agent.core.retrieval import get_embeddings_client
 
 from agent.core.db import get_connection
@@ -84,7 +85,7 @@ def chunk_python_file(path: Path, repo_root: Path) -> List[CodeChunk]:
         chunk = chunk.strip()
         if not chunk:
             continue
-        content_hash = _hash_content(f"{rel_path}:{idx}:{chunk}")
+        content_hash = _hash_content(chunk)
         results.append(
             CodeChunk(
                 file_path=rel_path,
@@ -109,16 +110,35 @@ def _iter_python_files(repo_root: Path) -> Iterable[Path]:
             yield path
 
 
-def _chunk_exists(conn, content_hash: str) -> bool:
+def _existing_embeddings(conn, content_hashes: List[str], model: str) -> set[str]:
     with conn.cursor(cursor_factory=RealDictCursor) as cur:
         cur.execute(
-            "SELECT 1 FROM code_embeddings WHERE content_hash = %s",
-            (content_hash,),
+            """
+            SELECT content_hash
+            FROM embedding_vectors
+            WHERE model = %s AND content_hash = ANY(%s)
+            """,
+            (model, content_hashes),
         )
-        return cur.fetchone() is not None
+        return {row["content_hash"] for row in cur.fetchall()}
 
 
-def _insert_chunk(conn, chunk: CodeChunk, embedding: List[float]) -> None:
+def _insert_embedding(
+    conn, content_hash: str, model: str, embedding: List[float]
+) -> None:
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            INSERT INTO embedding_vectors (content_hash, model, embedding)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (content_hash, model) DO NOTHING
+            """,
+            (content_hash, model, embedding),
+        )
+
+
+def _upsert_chunk(conn, chunk: CodeChunk, model: str) -> bool:
+    """Store the chunk location; return False if it was already up to date."""
     with conn.cursor() as cur:
         cur.execute(
             """
@@ -128,13 +148,24 @@ def _insert_chunk(conn, chunk: CodeChunk, embedding: List[float]) -> None:
                 file_extension,
                 content,
                 content_hash,
+                embedding_model,
                 language,
                 chunk_index,
                 total_chunks,
-                embedding,
                 token_count
             ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (content_hash) DO NOTHING
+            ON CONFLICT (file_path, chunk_index) DO UPDATE SET
+                file_name = EXCLUDED.file_name,
+                file_extension = EXCLUDED.file_extension,
+                content = EXCLUDED.content,
+                content_hash = EXCLUDED.content_hash,
+                embedding_model = EXCLUDED.embedding_model,
+                language = EXCLUDED.language,
+                total_chunks = EXCLUDED.total_chunks,
+                token_count = EXCLUDED.token_count
+            WHERE code_embeddings.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                OR code_embeddings.embedding_model IS DISTINCT FROM EXCLUDED.embedding_model
+                OR code_embeddings.total_chunks IS DISTINCT FROM EXCLUDED.total_chunks
             """,
             (
                 chunk.file_path,
@@ -142,13 +173,14 @@ def _insert_chunk(conn, chunk: CodeChunk, embedding: List[float]) -> None:
                 chunk.file_extension,
                 chunk.content,
                 chunk.content_hash,
+                model,
                 chunk.language,
                 chunk.chunk_index,
                 chunk.total_chunks,
-                embedding,
                 chunk.token_count,
             ),
         )
+        return cur.rowcount > 0
 
 
 def ingest_python_repository(repo_root: Path) -> dict:
@@ -158,9 +190,12 @@ def ingest_python_repository(repo_root: Path) -> dict:
         raise FileNotFoundError(f"Repository path {repo_root} does not exist")
 
     embedding_client = get_embeddings_client()
+    model = settings.embeddings_model
     processed_files = 0
     inserted_chunks = 0
     skipped_chunks = 0
+    embedded_chunks = 0
+    reused_embeddings = 0
 
     with get_connection() as conn:
         for file_path in _iter_python_files(repo_root):
@@ -168,21 +203,39 @@ def ingest_python_repository(repo_root: Path) -> dict:
             chunks = chunk_python_file(file_path, repo_root)
             if not chunks:
                 continue
-            vectors = embedding_client.embed_documents(
-                [chunk.content for chunk in chunks]
+
+            # Vectors are keyed by content only, so moved, renamed or copied
+            # code is looked up here instead of being sent to the API again.
+            existing = _existing_embeddings(
+                conn, [chunk.content_hash for chunk in chunks], model
+            )
+            missing = {
+                chunk.content_hash: chunk.content
+                for chunk in chunks
+                if chunk.content_hash not in existing
+            }
+            reused_embeddings += sum(
+                1 for chunk in chunks if chunk.content_hash in existing
             )
-            for chunk, vector in zip(chunks, vectors):
-                if _chunk_exists(conn, chunk.content_hash):
+            if missing:
+                vectors = embedding_client.embed_documents(list(missing.values()))
+                for content_hash, vector in zip(missing, vectors):
+                    _insert_embedding(conn, content_hash, model, vector)
+                embedded_chunks += len(missing)
+
+            for chunk in chunks:
+                if _upsert_chunk(conn, chunk, model):
+                    inserted_chunks += 1
+                else:
                     skipped_chunks += 1
-                    continue
-                _insert_chunk(conn, chunk, vector)
-                inserted_chunks += 1
 
         conn.commit()
     return {
         "files_processed": processed_files,
         "chunks_inserted": inserted_chunks,
         "chunks_skipped": skipped_chunks,
+        "chunks_embedded": embedded_chunks,
+        "embeddings_reused": reused_embeddings,
     }
 
 
@@ -207,6 +260,8 @@ def main() -> None:
     print(f"  Files processed: {stats['files_processed']}")
     print(f"  Chunks inserted: {stats['chunks_inserted']}")
     print(f"  Chunks skipped: {stats['chunks_skipped']}")
+    print(f"  Chunks embedded: {stats['chunks_embedded']}")
+    print(f"  Embeddings reused: {stats['embeddings_reused']}")
 
 
 if __name__ == "__main__":
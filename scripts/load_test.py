@@ -0,0 +1,367 @@
+"""Concurrent load generator for the compiled agent graph.
+
+Drives simulated chat sessions through ``build_graph()`` at increasing
+concurrency levels. The chat model and the embeddings client are replaced by
+local stand-ins with configurable latency, so the run needs no network access;
+vector search still goes to the Postgres instance from docker-compose.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List
+from uuid import UUID
+
+from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agent.core import nodes, retrieval
+from agent.core.graph import build_graph
+from agent.core.state import State
+
+load_dotenv()
+
+_EMBEDDING_DIMENSIONS = 1536
+_END_TO_END = "end_to_end"
+_SUPPORTED_QUERIES = [
+    "How does authentication work in this project?",
+    "Which endpoint handles user login in app/api/auth.py?",
+    "Explain the database session handling in the code.",
+    "What does the router module register?",
+    "Which service class validates exercise input?",
+    "Where is the api dependency for the current user defined?",
+]
+_REJECTED_QUERIES = [
+    "What is the weather in Berlin today?",
+    "Write me a poem about spring.",
+]
+
+
+@dataclass
+class StandInChatModel:
+    """Chat model replacement that simulates time-to-first-token and decoding."""
+
+    first_token_latency: float
+    tokens_per_second: float
+    response_tokens: int
+
+    def invoke(self, messages: List[Any]) -> AIMessage:
+        time.sleep(self.first_token_latency)
+        if self.tokens_per_second > 0:
+            time.sleep(self.response_tokens / self.tokens_per_second)
+        return AIMessage(content=" ".join(["token"] * self.response_tokens))
+
+
+class StandInEmbeddings(Embeddings):
+    """Embeddings replacement returning deterministic unit vectors."""
+
+    def __init__(self, latency: float, dimensions: int = _EMBEDDING_DIMENSIONS):
+        self.latency = latency
+        self.dimensions = dimensions
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8])
+        rng = random.Random(seed)
+        values = [rng.gauss(0.0, 1.0) for _ in range(self.dimensions)]
+        norm = math.sqrt(sum(value * value for value in values)) or 1.0
+        return [value / norm for value in values]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.latency)
+        return self._vector(text)
+
+
+class NodeTimingHandler(BaseCallbackHandler):
+    """Record wall-clock durations of graph nodes and whole graph runs."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._started: Dict[UUID, tuple[str, float]] = {}
+        self.samples: Dict[str, List[float]] = {}
+        self.errors = 0
+        self.first_error: str | None = None
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any] | None,
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: Dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        if parent_run_id is None:
+            label = _END_TO_END
+        else:
+            # Only the node runnable itself carries its own name; nested
+            # runnables (edges, channel writes) inherit the metadata only.
+            node = (metadata or {}).get("langgraph_node")
+            if node is None or kwargs.get("name") != node:
+                return
+            label = node
+        with self._lock:
+            self._started[run_id] = (label, time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> None:
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is None:
+                return
+            label, start = started
+            self.samples.setdefault(label, []).append(time.perf_counter() - start)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        # Failed runs are counted but kept out of the latency samples.
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            if started is not None and started[0] == _END_TO_END:
+                self.errors += 1
+                if self.first_error is None:
+                    self.first_error = f"{type(error).__name__}: {error}"
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    sessions: int
+    requests: int
+    errors: int
+    duration_s: float
+    throughput_rps: float
+    first_error: str | None = None
+    latency_ms: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    values = sorted(samples)
+    return {
+        "count": len(values),
+        "p50": round(_percentile(values, 50) * 1000, 2),
+        "p95": round(_percentile(values, 95) * 1000, 2),
+        "p99": round(_percentile(values, 99) * 1000, 2),
+        "max": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+def _session_queries(session_id: int, turns: int, reject_ratio: float) -> List[str]:
+    rng = random.Random(session_id)
+    queries = []
+    for _ in range(turns):
+        pool = _REJECTED_QUERIES if rng.random() < reject_ratio else _SUPPORTED_QUERIES
+        queries.append(rng.choice(pool))
+    return queries
+
+
+def _run_session(graph, queries: List[str], handler: NodeTimingHandler) -> int:
+    messages: list = []
+    for query in queries:
+        messages.append(HumanMessage(content=query))
+        state: State = {
+            "messages": messages,
+            "retrieved_context": [],
+            "guardrail_message": None,
+        }
+        try:
+            new_state = graph.invoke(state, config={"callbacks": [handler]})
+        except Exception:
+            # Counted and recorded by the handler; the session keeps going like
+            # a user retrying.
+            continue
+        messages = new_state["messages"]
+    return len(queries)
+
+
+def run_level(
+    graph, concurrency: int, sessions: int, turns: int, reject_ratio: float
+) -> LevelResult:
+    handler = NodeTimingHandler()
+    plans = [
+        _session_queries(session_id, turns, reject_ratio)
+        for session_id in range(sessions)
+    ]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        requests = sum(
+            pool.map(lambda queries: _run_session(graph, queries, handler), plans)
+        )
+    duration = time.perf_counter() - start
+
+    return LevelResult(
+        concurrency=concurrency,
+        sessions=sessions,
+        requests=requests,
+        errors=handler.errors,
+        duration_s=round(duration, 3),
+        throughput_rps=(
+            round((requests - handler.errors) / duration, 2) if duration else 0.0
+        ),
+        first_error=handler.first_error,
+        latency_ms={
+            label: _summarize(samples)
+            for label, samples in sorted(handler.samples.items())
+        },
+    )
+
+
+def _install_stand_ins(args: argparse.Namespace) -> None:
+    chat_model = StandInChatModel(
+        first_token_latency=args.llm_latency,
+        tokens_per_second=args.llm_tokens_per_second,
+        response_tokens=args.llm_response_tokens,
+    )
+    embeddings = StandInEmbeddings(latency=args.embedding_latency)
+    setattr(nodes, "get_llm", lambda: chat_model)
+    setattr(retrieval, "get_embeddings_client", lambda: embeddings)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_level(result: LevelResult) -> None:
+    print(
+        f"concurrency={result.concurrency} requests={result.requests} "
+        f"errors={result.errors} throughput={result.throughput_rps} req/s"
+    )
+    if result.first_error is not None:
+        print(f"  first error: {result.first_error}")
+    for label, stats in result.latency_ms.items():
+        print(
+            f"  {label:<12} n={stats['count']:<5} p50={stats['p50']:>9.2f}ms "
+            f"p95={stats['p95']:>9.2f}ms p99={stats['p99']:>9.2f}ms"
+        )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Load test the agent graph with local model stand-ins"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 2, 4, 8, 16],
+        help="Comma separated concurrency levels to ramp through",
+    )
+    parser.add_argument(
+        "--sessions-per-worker",
+        type=int,
+        default=4,
+        help="Sessions started per concurrent worker at each level",
+    )
+    parser.add_argument(
+        "--turns", type=int, default=3, help="User turns per simulated session"
+    )
+    parser.add_argument(
+        "--reject-ratio",
+        type=float,
+        default=0.1,
+        help="Share of turns that the guardrail should reject",
+    )
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=0.3,
+        help="Seconds until the stand-in chat model emits its first token",
+    )
+    parser.add_argument(
+        "--llm-tokens-per-second",
+        type=float,
+        default=80.0,
+        help="Decoding rate of the stand-in chat model",
+    )
+    parser.add_argument(
+        "--llm-response-tokens",
+        type=int,
+        default=150,
+        help="Tokens in every stand-in chat completion",
+    )
+    parser.add_argument(
+        "--embedding-latency",
+        type=float,
+        default=0.1,
+        help="Seconds per stand-in embedding request",
+    )
+    parser.add_argument(
+        "--speculative",
+        action="store_true",
+        help="Run retrieval in parallel with the guardrail",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write results as JSON to this path for comparison across commits",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    _install_stand_ins(args)
+    graph = build_graph(with_telemetry=False, speculative=args.speculative)
+
+    results: List[LevelResult] = []
+    for concurrency in args.concurrency:
+        result = run_level(
+            graph,
+            concurrency=concurrency,
+            sessions=concurrency * args.sessions_per_worker,
+            turns=args.turns,
+            reject_ratio=args.reject_ratio,
+        )
+        _print_level(result)
+        results.append(result)
+
+    if args.output is not None:
+        report = {
+            "revision": _git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "config": {
+                key: str(value) if isinstance(value, Path) else value
+                for key, value in vars(args).items()
+            },
+            "levels": [asdict(result) for result in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()